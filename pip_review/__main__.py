@@ -1,38 +1,40 @@
-from __future__ import absolute_import
+import os
 import re
-import argparse
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 import logging
-import json
 import sys
+import threading
 import pip
 import subprocess
 from packaging import version
 
-PY3 = sys.version_info.major == 3
-if PY3:  # Python3 Imports
-    def check_output(*args, **kwargs):
-        process = subprocess.Popen(stdout=subprocess.PIPE, *args, **kwargs)
-        output, _ = process.communicate()
-        retcode = process.poll()
-        if retcode:
-            error = subprocess.CalledProcessError(retcode, args[0])
-            error.output = output
-            raise error
-        return output
-
-else:  # Python2 Imports
-    from subprocess import check_output
-    import __builtin__
-    input = getattr(__builtin__, 'raw_input')
-
-
-VERSION_PATTERN = re.compile(
-    version.VERSION_PATTERN,
-    re.VERBOSE | re.IGNORECASE,  # necessary according to the `packaging` docs
+try:  # orjson is considerably faster on pip's JSON output, if available
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+# Matches one line of pre-9.0 `pip list --outdated` output in either of
+# its historical shapes:
+#   pip 6-9: "requests (2.5.1) - Latest: 2.6.0 [wheel]"
+#   pip < 6: "requests (Current: 2.5.1 Latest: 2.6.0)"
+# capturing everything we need in a single pass; the group names double
+# as the dict keys.
+LEGACY_PATTERN = re.compile(
+    r'^(?P<name>[a-z0-9_-]+)'
+    r'[^(\n]*\((?:Current:[ \t]*)?(?P<version>[^)\s]+)'
+    r'[^:\n]*:[ \t]*(?P<latest_version>[^)\s]+)',
+    re.IGNORECASE | re.MULTILINE,
 )
 
-NAME_PATTERN = re.compile(r'[a-z0-9_-]+', re.IGNORECASE)
+PIP_CMD = [sys.executable, '-m', 'pip']
+
+# pip's version cannot change within a process, and the major component
+# alone decides both feature checks, so an int comparison is all that is
+# needed — no PEP 440 machinery.
+PIP_MAJOR = int(pip.__version__.split('.', 1)[0])
+PIP_HAS_VERSION_CHECK_OPT = PIP_MAJOR >= 6
+PIP_HAS_JSON_FORMAT = PIP_MAJOR >= 10
 
 EPILOG = '''
 Unrecognised arguments will be forwarded to pip list --outdated and
@@ -41,12 +43,6 @@ and they will do what you expect. See pip list -h and pip install -h
 for a full overview of the options.
 '''
 
-DEPRECATED_NOTICE = '''
-Support for Python 2.6 and Python 3.2 has been stopped. From
-version 1.0 onwards, pip-review only supports Python==2.7 and
-Python>=3.3.
-'''
-
 # parameters that pip list supports but not pip install
 LIST_ONLY = set('l local path format not-required exclude-editable include-editable'.split())
 
@@ -54,19 +50,14 @@ LIST_ONLY = set('l local path format not-required exclude-editable include-edita
 INSTALL_ONLY = set('c constraint no-deps t target platform python-version implementation abi root prefix b build src U upgrade upgrade-strategy force-reinstall I ignore-installed ignore-requires-python no-build-isolation use-pep517 install-option global-option compile no-compile no-warn-script-location no-warn-conflicts no-binary only-binary prefer-binary no-clean require-hashes progress-bar'.split())
 
 
-def version_epilog():
-    """Version-specific information to be add to the help page."""
-    if sys.version_info < (2, 7) or (3, 0) <= sys.version_info < (3, 3):
-        return DEPRECATED_NOTICE
-    else:
-        return ''
-
-
 def parse_args():
+    # argparse is only needed here, so import it lazily to keep startup
+    # lean for embedders of the module-level helpers.
+    import argparse
     description = 'Keeps your Python packages fresh. Looking for a new maintainer! See https://github.com/jgonggrijp/pip-review/issues/76'
     parser = argparse.ArgumentParser(
         description=description,
-        epilog=EPILOG+version_epilog(),
+        epilog=EPILOG,
     )
     parser.add_argument(
         '--verbose', '-v', action='store_true', default=False,
@@ -83,6 +74,17 @@ def parse_args():
     parser.add_argument(
         '--continue-on-fail', '-C', action='store_true', default=False,
         help='Continue with other installs when one fails')
+    # No short alias: -f belongs to pip's --find-links, which must keep
+    # forwarding like any other unrecognized argument.
+    parser.add_argument(
+        '--fast', action='store_true', default=False,
+        help='Query PyPI directly instead of running pip list; faster, '
+             'but only used when no arguments are forwarded to pip list '
+             'and no custom index is configured')
+    parser.add_argument(
+        '--jobs', '-j', type=int, default=None, metavar='N',
+        help='Run up to N pip installs in parallel '
+             '(default: min(8, number of packages))')
     return parser.parse_known_args()
 
 
@@ -105,13 +107,11 @@ def filter_forwards(args, exclude):
     return result
 
 
-def pip_cmd():
-    return [sys.executable, '-m', 'pip']
-
-
 class StdOutFilter(logging.Filter):
     def filter(self, record):
-        return record.levelno in [logging.DEBUG, logging.INFO]
+        # Everything below WARNING goes to stdout; equivalent to the old
+        # [DEBUG, INFO] membership test without the list allocation.
+        return record.levelno <= logging.INFO
 
 
 def setup_logging(verbose):
@@ -139,84 +139,262 @@ def setup_logging(verbose):
     return logger
 
 
-class InteractiveAsker(object):
-    def __init__(self):
-        self.cached_answer = None
-        self.last_answer= None
-
-    def ask(self, prompt):
-        if self.cached_answer is not None:
-            return self.cached_answer
+SELECTION_PATTERN = re.compile(r'(\d+)(?:-(\d+))?')
+
+
+def ask_selection(packages):
+    """Prompt once for which of the numbered `packages` to upgrade.
+
+    Accepts comma- or space-separated numbers and ranges (e.g. "1,3-5"),
+    or the words "all" and "none". Re-asks until the answer is valid.
+    """
+    prompt = 'Select packages to upgrade [1-{0}/all/none]: '.format(
+        len(packages))
+    while True:
+        answer = input(prompt).strip().lower()
+        if answer == 'all':
+            return list(packages)
+        if answer == 'none':
+            return []
+        indexes = set()
+        for token in re.split(r'[,\s]+', answer):
+            # Each token must be exactly a number or a forward range;
+            # partial matches like "1.5" must not slip through.
+            match = SELECTION_PATTERN.fullmatch(token)
+            if match is None:
+                indexes.clear()
+                break
+            start = int(match[1])
+            end = int(match[2] or start)
+            if not 1 <= start <= end <= len(packages):
+                indexes.clear()
+                break
+            indexes.update(range(start, end + 1))
+        if indexes:
+            return [packages[i - 1] for i in sorted(indexes)]
+
+
+# Keep each pip install command line comfortably below the smallest
+# common ARG_MAX (128kB on macOS) so huge update sets cannot hit E2BIG.
+MAX_INSTALL_CMD_BYTES = 100_000
+
+
+def _chunk_packages(packages, max_count, max_bytes=MAX_INSTALL_CMD_BYTES):
+    """Group `packages` so no chunk exceeds `max_count` entries or puts
+    more than `max_bytes` of package names on one command line."""
+    chunk = []
+    size = 0
+    for pkg in packages:
+        token_len = len(pkg['name'].encode('utf-8')) + 1
+        if chunk and (len(chunk) >= max_count or size + token_len > max_bytes):
+            yield chunk
+            chunk = []
+            size = 0
+        chunk.append(pkg)
+        size += token_len
+    if chunk:
+        yield chunk
+
+
+def update_packages(packages, forwarded, continue_on_fail, jobs=None):
+    if jobs is None:
+        jobs = min(8, len(packages))
+    jobs = max(jobs, 1)
+    # Serialize writes so the output of concurrent installs does not
+    # interleave.
+    output_lock = threading.Lock()
+
+    def install(chunk):
+        upgrade_cmd = (PIP_CMD + ['install', '-U'] + forwarded
+                       + [pkg['name'] for pkg in chunk])
+        process = subprocess.Popen(
+            upgrade_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        output, error = process.communicate()
+        with output_lock:
+            if output:
+                sys.stdout.write(output.decode('utf-8', 'replace'))
+            if error:
+                sys.stderr.write(error.decode('utf-8', 'replace'))
+        return process.poll()
+
+    if continue_on_fail:
+        # One package per command keeps failures isolated.
+        chunks = [[pkg] for pkg in packages]
+    else:
+        # Batch packages to amortize pip's startup cost, but spread them
+        # over at least `jobs` chunks so every worker stays busy.
+        per_chunk = -(-len(packages) // jobs)
+        chunks = list(_chunk_packages(packages, per_chunk))
 
-        answer = ''
-        while answer not in ['y', 'n', 'a', 'q']:
-            question_last='{0} [Y]es, [N]o, [A]ll, [Q]uit ({1}) '.format(prompt, self.last_answer)
-            question_default='{0} [Y]es, [N]o, [A]ll, [Q]uit '.format(prompt)
-            answer = input(question_last if self.last_answer else question_default)
-            answer = answer.strip().lower()
-            answer = self.last_answer if answer == '' else answer
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        returncodes = list(executor.map(install, chunks))
 
-        if answer in ['q', 'a']:
-            self.cached_answer = answer
-        self.last_answer = answer
+    if any(returncodes) and not continue_on_fail:
+        raise SystemExit('Some upgrades failed')
 
-        return answer
 
+CONFIRM_ANSWERS = frozenset('yn')
 
-ask_to_install = partial(InteractiveAsker().ask, prompt='Upgrade now?')
 
+# Runs in a helper process: imports pip once, then performs one install
+# per line read from stdin, so N installs cost one interpreter startup
+# and one pip import instead of N of each.
+PIP_SERVER_SCRIPT = '''\
+import shlex, sys
+from pip._internal.cli.main import main
+status = 0
+for line in sys.stdin:
+    line = line.strip()
+    if line:
+        status |= bool(main(shlex.split(line)))
+sys.exit(status)
+'''
 
-def update_packages(packages, forwarded, continue_on_fail):
-    upgrade_cmd = pip_cmd() + ['install', '-U'] + forwarded
-    if not continue_on_fail:
-        upgrade_cmd += ['{0}'.format(pkg['name']) for pkg in packages]
-        subprocess.call(upgrade_cmd, stdout=sys.stdout, stderr=sys.stderr)
-        return
 
-    upgrade_cmd.append('')
-    for pkg in packages:
-        upgrade_cmd[-1] = '{0}'.format(pkg['name'])
-        subprocess.call(upgrade_cmd, stdout=sys.stdout, stderr=sys.stderr)
+def start_pip_server():
+    """Spawn the warmed pip helper process, or return None if pip's
+    internal entry point is unavailable or the spawn fails."""
+    try:
+        from pip._internal.cli.main import main  # noqa: F401
+    except ImportError:
+        return None
+    try:
+        return subprocess.Popen(
+            [sys.executable, '-c', PIP_SERVER_SCRIPT],
+            stdin=subprocess.PIPE,
+        )
+    except OSError:
+        return None
+
+
+def run_pip_server(server, packages, forwarded, continue_on_fail):
+    """Feed the selected installs to the warmed pip helper.
+
+    Returns an empty list once the helper has processed everything, or
+    `packages` unchanged if talking to it failed, so the caller can fall
+    back to regular subprocess installs.
+    """
+    import shlex
+    try:
+        for pkg in packages:
+            spec = shlex.join(['install', '-U'] + forwarded + [pkg['name']])
+            server.stdin.write((spec + '\n').encode('utf-8'))
+        server.stdin.close()
+    except OSError:
+        server.kill()
+        server.wait()
+        return packages
+    retcode = server.wait()
+    if retcode and packages and not continue_on_fail:
+        raise SystemExit('Some upgrades failed')
+    return []
 
 
 def confirm(question):
     answer = ''
-    while answer not in ['y', 'n']:
+    while answer not in CONFIRM_ANSWERS:
         answer = input(question)
         answer = answer.strip().lower()
     return answer == 'y'
 
 
 def parse_legacy(pip_output):
-    packages = []
-    for line in pip_output.splitlines():
-        name_match = NAME_PATTERN.match(line)
-        version_matches = [
-            match.group() for match in VERSION_PATTERN.finditer(line)
-        ]
-        if name_match and len(version_matches) == 2:
-            packages.append({
-                'name': name_match.group(),
-                'version': version_matches[0],
-                'latest_version': version_matches[1],
-            })
-    return packages
+    return [
+        match.groupdict() for match in LEGACY_PATTERN.finditer(pip_output)
+    ]
+
+
+def _iter_json_array(stream):
+    """Yield the objects of a JSON array read from a binary `stream`.
+
+    Each top-level object is parsed as soon as its closing brace arrives,
+    so callers can start consuming packages while pip is still probing
+    the index, and the full array is never held in memory.
+    """
+    depth = 0
+    in_string = escaped = False
+    item = bytearray()
+    for chunk in iter(partial(stream.read, 8192), b''):
+        for byte in chunk:
+            if depth:
+                item.append(byte)
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif byte == 0x5c:  # backslash
+                    escaped = True
+                elif byte == 0x22:  # double quote
+                    in_string = False
+            elif byte == 0x22:
+                in_string = True
+            elif byte == 0x7b:  # opening brace
+                if not depth:
+                    item = bytearray(b'{')
+                depth += 1
+            elif byte == 0x7d:  # closing brace
+                depth -= 1
+                if not depth:
+                    yield _json_loads(bytes(item))
 
 
 def get_outdated_packages(forwarded):
-    command = pip_cmd() + ['list', '--outdated'] + forwarded
-    pip_version = version.parse(pip.__version__)
-    if pip_version >= version.parse('6.0'):
+    command = PIP_CMD + ['list', '--outdated'] + forwarded
+    if PIP_HAS_VERSION_CHECK_OPT:
         command.append('--disable-pip-version-check')
-    if pip_version > version.parse('9.0'):
+    if PIP_HAS_JSON_FORMAT:
         command.append('--format=json')
-        output = check_output(command).decode('utf-8')
-        packages = json.loads(output)
-        return packages
+        process = subprocess.Popen(command, stdout=subprocess.PIPE)
+        for pkg in _iter_json_array(process.stdout):
+            yield pkg
+        retcode = process.wait()
+        if retcode:
+            raise subprocess.CalledProcessError(retcode, command)
     else:
-        output = check_output(command).decode('utf-8').strip()
-        packages = parse_legacy(output)
-        return packages
+        output = subprocess.check_output(command).decode('utf-8').strip()
+        for pkg in parse_legacy(output):
+            yield pkg
+
+
+def get_outdated_from_index():
+    """Find outdated packages by querying PyPI's JSON API directly.
+
+    Skips the `python -m pip` subprocess entirely — the dominant cost of
+    a run, since it re-imports all of pip — and issues the per-package
+    index requests concurrently instead of serially as pip does. Only
+    valid against the default index; callers must fall back to
+    get_outdated_packages when a custom index or extra pip list
+    arguments are in play.
+    """
+    from importlib.metadata import distributions
+    from urllib.request import urlopen
+
+    installed = {}
+    for dist in distributions():
+        name = dist.metadata['Name']
+        if name:
+            installed.setdefault(name, dist.version)
+
+    def query(item):
+        name, installed_version = item
+        try:
+            with urlopen(f'https://pypi.org/pypi/{name}/json',
+                         timeout=15) as response:
+                latest = _json_loads(response.read())['info']['version']
+            if version.parse(latest) > version.parse(installed_version):
+                return {
+                    'name': name,
+                    'version': installed_version,
+                    'latest_version': latest,
+                }
+        except (OSError, KeyError, version.InvalidVersion):
+            pass  # unknown to PyPI, unreachable, or unparsable version
+        return None
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        for pkg in executor.map(query, sorted(installed.items())):
+            if pkg is not None:
+                yield pkg
 
 
 def main():
@@ -228,26 +406,62 @@ def main():
     if args.raw and args.interactive:
         raise SystemExit('--raw and --interactive cannot be used together')
 
-    outdated = get_outdated_packages(list_args)
-    if not outdated and not args.raw:
-        logger.info('Everything up-to-date')
-    elif args.auto:
-        update_packages(outdated, install_args, args.continue_on_fail)
+    if args.fast and not list_args and 'PIP_INDEX_URL' not in os.environ:
+        outdated = get_outdated_from_index()
+    else:
+        outdated = get_outdated_packages(list_args)
+
+    selected = []
+    candidates = []
+    raw_lines = []
+
+    # The mode flags are loop-invariant, so pick the per-package action
+    # once instead of re-branching on every package. --auto must win
+    # over --raw, as it always has: '--auto --raw' installs.
+    if args.auto:
+        action = selected.append
     elif args.raw:
-        for pkg in outdated:
-            logger.info('{0}=={1}'.format(pkg['name'], pkg['latest_version']))
+        def action(pkg):
+            # Must stay on the JSON format: `pip list --format=freeze`
+            # would pin the *installed* versions, while raw output
+            # promises the latest ones, suitable for pip install.
+            raw_lines.append(f"{pkg['name']}=={pkg['latest_version']}\n")
+    elif args.interactive:
+        def action(pkg):
+            candidates.append(pkg)
+            logger.info(
+                f"{len(candidates)}. {pkg['name']}=={pkg['latest_version']} "
+                f"is available (you have {pkg['version']})"
+            )
     else:
-        selected = []
-        for pkg in outdated:
-            logger.info('{0}=={1} is available (you have {2})'.format(
-                pkg['name'], pkg['latest_version'], pkg['version']
-            ))
-            if args.interactive:
-                answer = ask_to_install()
-                if answer in ['y', 'a']:
-                    selected.append(pkg)
-        if selected:
-            update_packages(selected, install_args, args.continue_on_fail)
+        def action(pkg):
+            logger.info(
+                f"{pkg['name']}=={pkg['latest_version']} is available "
+                f"(you have {pkg['version']})"
+            )
+
+    found = False
+    for pkg in outdated:
+        found = True
+        action(pkg)
+    if raw_lines:
+        # Machine-consumable output does not need the logging machinery;
+        # one writelines beats a handler chain round-trip per package.
+        sys.stdout.writelines(raw_lines)
+        sys.stdout.flush()
+    if candidates:
+        # Start the helper before prompting, so pip warms up while the
+        # user is still looking at the menu.
+        server = start_pip_server()
+        selected = ask_selection(candidates)
+        if server is not None:
+            selected = run_pip_server(server, selected, install_args,
+                                      args.continue_on_fail)
+    if not found and not args.raw:
+        logger.info('Everything up-to-date')
+    elif selected:
+        update_packages(selected, install_args, args.continue_on_fail,
+                        args.jobs)
 
 
 if __name__ == '__main__':
@@ -1,17 +1,19 @@
 from copy import deepcopy
+from io import BytesIO
+import os
 import subprocess
 from unittest.mock import patch, call, Mock
 from sys import executable as python
 
 from pytest import raises
 
-from pip_review.__main__ import main
+from pip_review.__main__ import ask_selection, get_outdated_from_index, main
 
 
 class FakePopen:
 
     def __init__(self, stdout=None, stderr=None, returncode=0):
-        self.stdout = stdout
+        self.stdout = None if stdout is None else BytesIO(stdout)
         self.stderr = stderr
         self.returncode = returncode
 
@@ -66,12 +68,21 @@ def simulate(sys_argv, fake_popens):
     return wrap
 
 
-UP_TO_DATE = FakePopen(b'[]\r\n')
+# Factories rather than shared instances: FakePopen.stdout is a stream
+# that main() consumes, so every test needs its own copy.
+def up_to_date():
+    return FakePopen(b'[]\r\n')
+
+
+def outdated_setuptools():
+    return FakePopen(
+        b'[{"name": "setuptools", "version": "65.1.1", "latest_version": "65.3.0", "latest_filetype": "wheel"}]\r\n'
+    )
 
 
 @simulate(
     [''],
-    [UP_TO_DATE],
+    [up_to_date()],
 )
 def test_everything_is_up_to_date(popen, logger):
     assert popen.call_args_list == [outdated_call()]
@@ -80,34 +91,27 @@ def test_everything_is_up_to_date(popen, logger):
 
 @simulate(
     [''],
-    [
-        FakePopen(
-            b'[{"name": "setuptools", "version": "65.1.1", "latest_version": "65.3.0", "latest_filetype": "wheel"}]\r\n'
-        ),
-    ],
+    [outdated_setuptools()],
 )
 def test_single_outdated_package(popen, logger):
     assert popen.call_args_list == [outdated_call()]
     assert logger.mock_calls == [call.info('setuptools==65.3.0 is available (you have 65.1.1)')]
 
 
-OUTDATED_SETUPTOOLS = FakePopen(
-    b'[{"name": "setuptools", "version": "65.1.1", "latest_version": "65.3.0", "latest_filetype": "wheel"}]\r\n'
-)
-
-
-@simulate(
-    ['', '--raw'],
-    [OUTDATED_SETUPTOOLS],
-)
-def test_raw_option(popen, logger):
+# Not wrapped in simulate(): raw mode writes to sys.stdout directly
+# instead of going through the logger, so capsys is needed here.
+def test_raw_option(capsys):
+    with patch('subprocess.Popen', CopyingMock(side_effect=[outdated_setuptools()])) as popen:
+        with patch('pip_review.__main__.setup_logging', return_value=Mock()):
+            with patch('sys.argv', ['', '--raw']):
+                main()
     assert popen.call_args_list == [outdated_call()]
-    assert logger.mock_calls == [call.info('setuptools==65.3.0')]
+    assert capsys.readouterr().out == 'setuptools==65.3.0\n'
 
 
 @simulate(
     ['', '--timeout', '30'],
-    [UP_TO_DATE],
+    [up_to_date()],
 )
 def test_forwarding_unrecognized_args(popen, logger):
     assert popen.call_args == outdated_call(['--timeout', '30'])
@@ -124,16 +128,29 @@ def test_forwarding_unrecognized_args_fails():
 
 @simulate(
     ['', '--auto'],
-    [UP_TO_DATE],
+    [up_to_date()],
 )
 def test_auto_up_to_date(popen, logger):
     assert popen.call_args_list == [outdated_call()]
     assert logger.mock_calls == [call.info('Everything up-to-date')]
 
 
+@simulate(
+    # --auto takes precedence over --raw: updates get installed.
+    ['', '--auto', '--raw'],
+    [outdated_setuptools(), FakePopen()],
+)
+def test_auto_wins_over_raw(popen, logger):
+    assert popen.call_args_list[0] == outdated_call()
+    assert popen.call_args_list[1].args[0] == [
+        python, '-m', 'pip', 'install', '-U', 'setuptools']
+    assert popen.call_count == 2
+    assert not logger.mock_calls
+
+
 @simulate(
     ['', '--auto', '--force-reinstall'],
-    [OUTDATED_SETUPTOOLS, FakePopen()],
+    [outdated_setuptools(), FakePopen()],
 )
 def test_forwarding_to_install_not_list(popen, logger):
     assert popen.call_args_list[0] == outdated_call()
@@ -145,7 +162,7 @@ def test_forwarding_to_install_not_list(popen, logger):
 
 @simulate(
     ['', '--auto', '--not-required'],
-    [OUTDATED_SETUPTOOLS, FakePopen()],
+    [outdated_setuptools(), FakePopen()],
 )
 def test_forwarding_to_list_not_install(popen, logger):
     assert popen.call_args_list[0] == outdated_call(['--not-required'])
@@ -155,8 +172,36 @@ def test_forwarding_to_list_not_install(popen, logger):
     assert not logger.mock_calls
 
 
+FIVE_PACKAGES = [{'name': f'pkg{i}'} for i in range(1, 6)]
+
+
+def select(answers, packages=FIVE_PACKAGES):
+    with patch('builtins.input', side_effect=answers):
+        return ask_selection(packages)
+
+
+def test_selection_numbers_and_ranges():
+    assert select(['2, 4-5']) == [FIVE_PACKAGES[1]] + FIVE_PACKAGES[3:]
+
+
+def test_selection_all():
+    assert select(['all']) == FIVE_PACKAGES
+
+
+def test_selection_none():
+    assert select(['none']) == []
+
+
+def test_selection_reasks_until_valid():
+    # Decimals, reversed ranges, out-of-range numbers and free text are
+    # all rejected; only the final answer counts.
+    assert select(['1.5', '3-1', '0', '9', 'yes', '', '2']) == [
+        FIVE_PACKAGES[1]]
+
+
 @simulate(
-    ['', '--auto', '--continue-on-fail'],
+    # --jobs 1 keeps the install order deterministic for the assertions below.
+    ['', '--auto', '--continue-on-fail', '--jobs', '1'],
     [
         FakePopen(
             b'[{"name": "badpackage", "version": "0.1", "latest_version": "0.2", "latest_filetype": "wheel"},'
@@ -174,3 +219,83 @@ def test_two_packages_one_failing_continue(popen, logger):
         python, '-m', 'pip', 'install', '-U', 'setuptools']
     assert popen.call_count == 3
     assert not logger.mock_calls
+
+
+class FakeHTTPResponse:
+
+    def __init__(self, body):
+        self.body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return
+
+    def read(self):
+        return self.body
+
+
+class FakeDistribution:
+
+    def __init__(self, name, version):
+        self.metadata = {'Name': name}
+        self.version = version
+
+
+def test_get_outdated_from_index():
+    distributions = [
+        FakeDistribution('outdated', '1.0'),
+        FakeDistribution('uptodate', '1.0'),
+        FakeDistribution('unknown-to-pypi', '1.0'),
+        FakeDistribution('unparsable', 'not-a-version'),
+    ]
+    responses = {
+        'https://pypi.org/pypi/outdated/json': b'{"info": {"version": "2.0"}}',
+        'https://pypi.org/pypi/uptodate/json': b'{"info": {"version": "1.0"}}',
+        'https://pypi.org/pypi/unparsable/json': b'{"info": {"version": "2.0"}}',
+    }
+
+    def fake_urlopen(url, timeout=None):
+        try:
+            return FakeHTTPResponse(responses[url])
+        except KeyError:
+            raise OSError('name or service not known')
+
+    with patch('importlib.metadata.distributions', return_value=iter(distributions)):
+        with patch('urllib.request.urlopen', fake_urlopen):
+            # Current, unknown and unparsable packages are all skipped.
+            assert list(get_outdated_from_index()) == [
+                {'name': 'outdated', 'version': '1.0', 'latest_version': '2.0'},
+            ]
+
+
+def test_fast_mode_queries_index_instead_of_pip():
+    with patch.dict('os.environ'):
+        os.environ.pop('PIP_INDEX_URL', None)
+        with patch('pip_review.__main__.get_outdated_from_index', return_value=iter([])) as fast:
+            with patch('subprocess.Popen', CopyingMock()) as popen:
+                with patch('pip_review.__main__.setup_logging', return_value=Mock()):
+                    with patch('sys.argv', ['', '--fast']):
+                        main()
+    fast.assert_called_once_with()
+    assert not popen.called
+
+
+@simulate(
+    # Forwarded pip list arguments disable --fast; only pip knows them.
+    ['', '--fast', '--not-required'],
+    [up_to_date()],
+)
+def test_fast_mode_forwarded_args_fall_back_to_pip(popen, logger):
+    assert popen.call_args_list == [outdated_call(['--not-required'])]
+    assert logger.mock_calls == [call.info('Everything up-to-date')]
+
+
+def test_fast_mode_custom_index_falls_back_to_pip():
+    with patch.dict('os.environ', {'PIP_INDEX_URL': 'https://example.com/simple'}):
+        with patch('subprocess.Popen', CopyingMock(side_effect=[up_to_date()])) as popen:
+            with patch('pip_review.__main__.setup_logging', return_value=Mock()):
+                with patch('sys.argv', ['', '--fast']):
+                    main()
+    assert popen.call_args_list == [outdated_call()]